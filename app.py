@@ -1,151 +1,359 @@
 import streamlit as st
 import yt_dlp
+import requests
+import diskcache
 import os
 import re
 import zipfile
 import io
 import json
 import tempfile
+import shutil
+import threading
 import streamlit.components.v1 as components
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from yt_dlp.utils import DownloadError
 
 st.set_page_config(page_title="Ultimate TikTok Downloader", layout="wide")
 
+# Max parallel metadata requests; kept modest to avoid TikTok rate-limiting.
+METADATA_FETCH_CONCURRENCY = 16
+# Max parallel video downloads when preparing a ZIP.
+ZIP_DOWNLOAD_CONCURRENCY = 8
+# ZIP archives are kept in memory up to this size, then spooled to a temp file.
+ZIP_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+# TikTok serves progressive (pre-muxed) MP4, so downloads ask for a single file and skip ffmpeg.
+PROGRESSIVE_FORMAT = 'best[ext=mp4]/best'
+# Second-pass selector for the rare video with no muxed format; this one needs ffmpeg to merge.
+MERGED_FORMAT = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+KEEP_ALIVE_HEADERS = {'Connection': 'keep-alive'}
+# On-disk store for App 3's pre-cached downloads.
+DOWNLOAD_CACHE_DIR = os.path.join(tempfile.gettempdir(), "tiktok_dl_cache")
+DOWNLOAD_CACHE_SIZE_LIMIT = 10 * 2**30
+# App 3 stops pre-caching at this volume, leaving headroom so it doesn't evict its own entries.
+DOWNLOAD_CACHE_PRECACHE_LIMIT = int(DOWNLOAD_CACHE_SIZE_LIMIT * 0.9)
+# Thumbnails share that disk cache and expire after an hour.
+THUMBNAIL_CACHE_TTL = 3600
+# Per-video metadata is cached there too, for as long as the profile listing.
+METADATA_CACHE_TTL = 600
+# Precompiled helpers for sanitize_filename.
+_WHITESPACE_RE = re.compile(r'[\s\n\r]+')
+_ILLEGAL_CHARS_TABLE = str.maketrans('', '', '\\/*?:"<>|')
+
 
 # ==============================================================================
 # 1. SHARED HELPER FUNCTIONS (COMMON TO ALL APPS)
 #    These functions are defined once here to be used by all app versions.
 # ==============================================================================
 
+@st.cache_resource(show_spinner=False)
+def get_session():
+    """Returns a process-wide requests.Session with a keep-alive connection pool and retries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=Retry(total=3, backoff_factor=0.3))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def _fetch_thumbnail(session, cache, url):
+    """Downloads one thumbnail into the disk cache; on failure returns the URL so the browser loads it instead."""
+    try:
+        response = session.get(url, timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Could not prefetch thumbnail {url}: {e}")
+        return url
+    cache.set(('thumbnail', url), response.content, expire=THUMBNAIL_CACHE_TTL)
+    return response.content
+
+def fetch_row_thumbnails(urls):
+    """
+    Returns an image source per thumbnail URL for one grid row. Cached thumbnails are served from disk;
+    the rest are fetched concurrently. Failed fetches are not cached, so the next rerun retries them.
+    """
+    cache = get_download_cache()
+    sources = [cache.get(('thumbnail', url)) if url else url for url in urls]
+    missing = [i for i, (url, source) in enumerate(zip(urls, sources)) if url and source is None]
+    if missing:
+        session = get_session()
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            for i, source in zip(missing, executor.map(lambda i: _fetch_thumbnail(session, cache, urls[i]), missing)):
+                sources[i] = source
+    return sources
+
 def sanitize_filename(name):
     """Removes invalid characters from a string to make it a valid filename."""
     if not name:
         return "untitled_video"
     sanitized_name = str(name)
-    sanitized_name = re.sub(r'[\s\n\r]+', '_', sanitized_name)  # Replace whitespace with underscores
-    sanitized_name = re.sub(r'[\\/*?:"<>|]', "", sanitized_name)  # Remove illegal characters
+    sanitized_name = _WHITESPACE_RE.sub('_', sanitized_name)  # Replace whitespace with underscores
+    sanitized_name = sanitized_name.translate(_ILLEGAL_CHARS_TABLE)  # Remove illegal characters
     return (sanitized_name[:100] + '..') if len(sanitized_name) > 100 else sanitized_name
 
-def render_copy_link_button(url: str, key: str):
-    """Renders a very small copy button that copies the given URL to the clipboard."""
-    safe_url = json.dumps(url)
-    btn_id = f"copy_btn_{sanitize_filename(str(key))}"
-    html_code = f"""
-    <div style="display:flex; align-items:center; justify-content:flex-end;">
-      <button id="{btn_id}"
-        title="Copy link"
-        style="
-          cursor:pointer; border:1px solid #93c5fd; border-radius:6px; background:#eaf2ff;
-          padding:2px 6px; font-size:12px; line-height:1.1; color:#1e3a8a; margin-top: 5px;
-        "
-        aria-label="Copy link"
-      >📋</button>
-    </div>
+def build_video_filename(video_info):
+    """Builds the '<uploader>_<title>.mp4' filename used for downloads and ZIP entries."""
+    uploader = sanitize_filename(video_info.get('uploader', 'user'))
+    title = sanitize_filename(video_info.get('title', 'video'))
+    return f"{uploader}_{title}.mp4"
+
+# Static markup for the copy-link buttons, built once; placeholders are filled with str.replace.
+_COPY_BTN_TEMPLATE = '<div class="cell"><button id="__BTN_ID__" class="copy-btn" title="Copy link" aria-label="Copy link">📋</button></div>'
+_COPY_BTN_EMPTY_CELL = '<div class="cell"></div>'
+_COPY_BTN_ROW_TEMPLATE = """
+    <style>
+      .row { display:grid; grid-template-columns:repeat(__COLUMNS__, minmax(0, 1fr)); column-gap:1rem; }
+      .cell { display:flex; align-items:center; justify-content:flex-end; }
+      .copy-btn {
+        cursor:pointer; border:1px solid #93c5fd; border-radius:6px; background:#eaf2ff;
+        padding:2px 6px; font-size:12px; line-height:1.1; color:#1e3a8a; margin-top: 5px;
+      }
+    </style>
+    <div class="row">__CELLS__</div>
     <script>
-      (function() {{
-        const btn = document.getElementById("{btn_id}");
-        const text = {safe_url};
-        if (btn) {{
-          btn.addEventListener('click', async () => {{
-            try {{
-              await navigator.clipboard.writeText(text);
-              const oldText = btn.textContent; btn.textContent = "✓";
-              btn.style.background = "#e7f9ee"; btn.style.borderColor = "#16a34a";
-              setTimeout(() => {{ btn.textContent = oldText; btn.style.background = "#eaf2ff"; btn.style.borderColor = "#93c5fd"; }}, 1200);
-            }} catch (err) {{
-              const oldText = btn.textContent; btn.textContent = "!";
-              btn.style.background = "#fdecec"; btn.style.borderColor = "#ef4444";
-              setTimeout(() => {{ btn.textContent = oldText; btn.style.background = "#eaf2ff"; btn.style.borderColor = "#93c5fd"; }}, 1200);
-            }}
-          }});
-        }}
-      }})();
+      (function() {
+        const urls = new Map(Object.entries(__URLS__));
+        const flash = (btn, text, background, border) => {
+          const oldText = btn.textContent; btn.textContent = text;
+          btn.style.background = background; btn.style.borderColor = border;
+          setTimeout(() => { btn.textContent = oldText; btn.style.background = "#eaf2ff"; btn.style.borderColor = "#93c5fd"; }, 1200);
+        };
+        document.addEventListener('click', async (event) => {
+          const btn = event.target.closest('button.copy-btn');
+          if (!btn || !urls.has(btn.id)) return;
+          try {
+            await navigator.clipboard.writeText(urls.get(btn.id));
+            flash(btn, "✓", "#e7f9ee", "#16a34a");
+          } catch (err) {
+            flash(btn, "!", "#fdecec", "#ef4444");
+          }
+        });
+      })();
     </script>
     """
-    components.html(html_code, height=35, width=50, scrolling=False)
 
-def fetch_user_videos(username, limit=None):
-    """Fetches a list of video metadata from a TikTok user's profile."""
+def render_copy_link_buttons_batch(urls_with_keys: list[tuple[str, str]], columns: int | None = None, width: int | None = None):
+    """
+    Renders a whole row of small copy buttons in a single iframe, one grid cell per (url, key) pair.
+    Pairs without a URL leave an empty cell so the buttons stay aligned with the columns above.
+    """
+    cells, urls_by_btn_id = [], {}
+    for url, key in urls_with_keys:
+        if url:
+            btn_id = f"copy_btn_{sanitize_filename(str(key))}"
+            urls_by_btn_id[btn_id] = url
+            cells.append(_COPY_BTN_TEMPLATE.replace("__BTN_ID__", btn_id))
+        else:
+            cells.append(_COPY_BTN_EMPTY_CELL)
+    safe_urls = json.dumps(urls_by_btn_id).replace("</", "<\\/")
+    html_code = (_COPY_BTN_ROW_TEMPLATE
+                 .replace("__COLUMNS__", str(columns or len(urls_with_keys)))
+                 .replace("__CELLS__", "".join(cells))
+                 .replace("__URLS__", safe_urls))
+    components.html(html_code, height=35, width=width, scrolling=False)
+
+def render_copy_link_button(url: str, key: str):
+    """Renders a very small copy button that copies the given URL to the clipboard."""
+    render_copy_link_buttons_batch([(url, key)], width=50)
+
+@st.cache_resource(show_spinner=False)
+def get_extraction_pool():
+    """
+    Returns a long-lived pool for metadata extraction. Each worker builds its YoutubeDL once,
+    on start-up, and keeps it warm for every later fetch in this server process.
+    """
+    thread_state = threading.local()
+
+    def _warm_ytdlp():
+        thread_state.ydl = yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True})
+
+    executor = ThreadPoolExecutor(max_workers=METADATA_FETCH_CONCURRENCY, thread_name_prefix="ytdlp-extract", initializer=_warm_ytdlp)
+    return executor, thread_state
+
+def _extract_info_in_worker(thread_state, url):
+    """Runs inside an extraction pool worker, using that worker's warm YoutubeDL instance."""
+    return thread_state.ydl.extract_info(url, download=False)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_profile_entries(username: str, limit: int | None) -> list[str]:
+    """
+    Lists the video URLs on a profile, cached per (username, limit) for ten minutes.
+    Exceptions propagate so that transient failures are never cached.
+    """
     profile_url = f"https://www.tiktok.com/@{username}"
+    # Flat listing only: extract_flat with force_generic_extractor returns just the entry URLs (up to
+    # playlistend). Full metadata for each entry is then resolved concurrently on the warm pool.
+    # Listing errors propagate untouched, so fetch_user_videos can still report e.g. an HTTP 404.
     ydl_opts = {'quiet': True, 'extract_flat': True, 'force_generic_extractor': True, 'skip_download': True}
     if limit: ydl_opts['playlistend'] = limit
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(profile_url, download=False)
+    return [entry['url'] for entry in info.get('entries') or []]
+
+def fetch_user_videos(username, limit=None):
+    """Fetches a list of video metadata from a TikTok user's profile."""
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(profile_url, download=False)
-            if 'entries' in info and info['entries']:
-                video_list, total_videos = [], len(info['entries'])
-                st.write(f"Found {total_videos} videos. Fetching individual details...")
-                progress_bar = st.progress(0, text="Fetching video details...")
-                for i, entry in enumerate(info['entries']):
-                    try:
-                        with yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True}) as ydl_single:
-                            video_info = ydl_single.extract_info(entry['url'], download=False)
-                            video_list.append(video_info)
-                        progress_bar.progress((i + 1) / total_videos, text=f"Fetching video {i+1}/{total_videos}")
-                    except Exception as single_e:
-                        print(f"Could not fetch metadata for entry {entry.get('url')}: {single_e}")
-                        continue
-                progress_bar.empty()
-                return video_list, None
-            else: return None, "No videos found for this user, or the profile is private."
+        entry_urls = _cached_profile_entries(username, limit)
+        if not entry_urls:
+            return None, "No videos found for this user, or the profile is private."
+
+        # Per-video metadata is cached on disk for ten minutes, so only uncached entries go to the pool.
+        cache = get_download_cache()
+        total_videos = len(entry_urls)
+        results = [cache.get(('metadata', url)) for url in entry_urls]
+        missing = [i for i, video_info in enumerate(results) if video_info is None]
+        st.write(f"Found {total_videos} videos. Fetching individual details...")
+        progress_bar = st.progress(0, text="Fetching video details...")
+        executor, thread_state = get_extraction_pool()
+        futures = {executor.submit(_extract_info_in_worker, thread_state, entry_urls[i]): i for i in missing}
+        for done, future in enumerate(as_completed(futures), start=total_videos - len(missing) + 1):
+            i = futures[future]
+            try:
+                video_info = future.result()
+                # Sanitize once here so downloads don't redo it on every call.
+                video_info['_cached_filename'] = build_video_filename(video_info)
+                cache.set(('metadata', entry_urls[i]), video_info, expire=METADATA_CACHE_TTL)
+                results[i] = video_info
+            except Exception as single_e:
+                print(f"Could not fetch metadata for entry {entry_urls[i]}: {single_e}")
+            progress_bar.progress(done / total_videos, text=f"Fetching video {done}/{total_videos}")
+        progress_bar.empty()
+        return [video_info for video_info in results if video_info], None
     except DownloadError as e:
         if "HTTP Error 404" in str(e): return None, f"❌ User '{username}' not found. Please check the User ID."
         return None, f"❌ Invalid User ID or private profile. Error: {e}"
     except Exception as e: return None, f"An unexpected error occurred: {e}"
 
+def _download_direct(video_info):
+    """
+    Resolves the direct URL of a pre-muxed MP4 with yt-dlp and streams it straight into memory.
+    Returns None when no single-file format is available, so the caller can fall back.
+    """
+    ydl_opts = {'format': PROGRESSIVE_FORMAT, 'quiet': True, 'skip_download': True, 'http_headers': KEEP_ALIVE_HEADERS}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_info['webpage_url'], download=False)
+        if info.get('requested_formats') or not info.get('url'):
+            return None
+
+        # Send yt-dlp's cookies along; TikTok's CDN rejects requests without the session cookies.
+        video_buffer = io.BytesIO()
+        with get_session().get(info['url'], headers=info.get('http_headers'), cookies=ydl.cookiejar, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                video_buffer.write(chunk)
+    video_buffer.seek(0)
+    return video_buffer
+
+def _download_via_temp_dir(video_info):
+    """Lets yt-dlp download (and merge, if needed) into a temporary directory, then reads the result into memory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename_template = f"{video_info.get('id', 'video')}.%(ext)s"
+        ydl_opts = {
+            'format': MERGED_FORMAT,
+            'outtmpl': os.path.join(temp_dir, filename_template),
+            'quiet': True,
+            'merge_output_format': 'mp4',
+            'http_headers': KEEP_ALIVE_HEADERS,
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([video_info['webpage_url']])
+
+        # Pick the largest file so stray fragments or thumbnails are never mistaken for the video.
+        with os.scandir(temp_dir) as it:
+            downloaded_files = [entry for entry in it if entry.is_file()]
+        if not downloaded_files: return None
+
+        downloaded_file = max(downloaded_files, key=lambda entry: entry.stat().st_size)
+        video_buffer = io.BytesIO()
+        with open(downloaded_file.path, 'rb') as f:
+            shutil.copyfileobj(f, video_buffer, length=1024 * 1024)
+        video_buffer.seek(0)
+        return video_buffer
+
 def robust_download_to_memory(video_info):
     """
     The most robust download function. Downloads any TikTok content (video, slideshows)
-    to a temporary file and then reads it into memory. This is the core download logic.
+    into an in-memory file, fetching the direct media URL when possible and falling back to
+    a full yt-dlp download otherwise. Returns the file rewound to the start, plus its name.
+    This is the core download logic.
     """
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            uploader = sanitize_filename(video_info.get('uploader', 'user'))
-            title = sanitize_filename(video_info.get('title', 'video'))
-            final_filename = f"{uploader}_{title}.mp4"
-            filename_template = f"{video_info.get('id', 'video')}.%(ext)s"
-
-            ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-                'outtmpl': os.path.join(temp_dir, filename_template),
-                'quiet': True,
-                'merge_output_format': 'mp4',
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_info['webpage_url']])
-
-            downloaded_files = os.listdir(temp_dir)
-            if not downloaded_files: return None, None
-
-            downloaded_file_path = os.path.join(temp_dir, downloaded_files[0])
-            with open(downloaded_file_path, 'rb') as f:
-                video_bytes = f.read()
-            
-            return video_bytes, final_filename
-        except Exception as e:
-            print(f"Failed to download {video_info.get('webpage_url')}. Error: {e}")
-            return None, None
+    final_filename = video_info.get('_cached_filename') or build_video_filename(video_info)
+
+    try:
+        video_file = _download_direct(video_info)
+    except Exception as e:
+        print(f"Direct fetch failed for {video_info.get('webpage_url')}, falling back to yt-dlp download. Error: {e}")
+        video_file = None
 
-# Cached version of the download function for App 3
-@st.cache_data(show_spinner=False)
+    try:
+        if video_file is None:
+            video_file = _download_via_temp_dir(video_info)
+        if video_file is None or not video_file.getbuffer().nbytes: return None, None
+        return video_file, final_filename
+    except Exception as e:
+        print(f"Failed to download {video_info.get('webpage_url')}. Error: {e}")
+        return None, None
+
+@st.cache_resource(show_spinner=False)
+def get_download_cache():
+    """Returns the on-disk cache of downloaded videos, shared by all sessions and kept across restarts."""
+    return diskcache.Cache(DOWNLOAD_CACHE_DIR, size_limit=DOWNLOAD_CACHE_SIZE_LIMIT)
+
+# Cached version of the download function for App 3. Pre-caches the video on disk, keyed by ID, and
+# returns (is_available, filename); the bytes are only read on click, by read_cached_download.
 def get_cached_download_data(video_info):
-    return robust_download_to_memory(video_info)
+    cache = get_download_cache()
+    filename = video_info.get('_cached_filename') or build_video_filename(video_info)
+    if video_info['id'] in cache:
+        return True, filename
+    failed_key = f"{video_info['id']}:failed"
+    if failed_key in cache:
+        return False, None
+    # Stop pre-caching before the size limit, or the grid would keep culling its own earlier entries.
+    # Videos left out are still offered; read_cached_download fetches them on click.
+    if cache.volume() >= DOWNLOAD_CACHE_PRECACHE_LIMIT:
+        return True, filename
+
+    video_file, filename = robust_download_to_memory(video_info)
+    if video_file and filename:
+        with video_file:
+            cache.set(video_info['id'], video_file, read=True)
+        return True, filename
+    # Remember failures briefly so every rerun doesn't retry them.
+    cache.set(failed_key, True, expire=600)
+    return False, None
+
+def read_cached_download(video_info):
+    """
+    Reads a video's bytes for a deferred download_button payload: from the disk cache when present,
+    otherwise (never pre-cached, or evicted since) by downloading it again.
+    """
+    cached_file = get_download_cache().get(video_info['id'], read=True)
+    if cached_file is None:
+        cached_file, _ = robust_download_to_memory(video_info)
+        if cached_file is None:
+            raise RuntimeError(f"Could not download {video_info.get('webpage_url')}")
+    with cached_file:
+        return cached_file.read()
 
 def chunked(iterable, size):
-    """Yields successive n-sized chunks from an iterable."""
-    for i in range(0, len(iterable), size):
-        yield iterable[i:i + size]
+    """Lazily yields successive n-sized chunks (as lists) from any iterable."""
+    it = iter(iterable)
+    return iter(lambda: list(islice(it, size)), [])
 
 def initialize_session_state():
     """Resets the session state, useful when switching between apps."""
     state_defaults = {
         'video_list': [], 'select_all': False, 'select_all_bottom': False,
-        'zip_bytes': None, 'zipped_selection_ids': [], 'zip_filename': None, 'failed_videos': [],
+        'zip_buffer': None, 'zip_read_lock': None, 'zipped_selection_ids': [], 'zip_filename': None, 'failed_videos': [],
         'preparing_video_id': None, 'prepared_download': {},
         'user_id': "",
         'download_triggered': False,
     }
+    invalidate_zip()  # Close any spooled archive before its state is dropped
     for key, default in state_defaults.items():
         st.session_state[key] = default
 
@@ -168,10 +376,11 @@ def common_action_bar_ui(position="top"):
             prepare_zip(selected_videos, st.session_state.user_id)
             
     with col3:
-        if st.session_state.zip_bytes:
+        if st.session_state.zip_buffer:
+            # Deferred so the archive is only read when the button is actually clicked, not on every rerun.
             st.download_button(
                 "📦 Download Zip Folder", 
-                st.session_state.zip_bytes, 
+                lambda zip_buffer=st.session_state.zip_buffer, lock=st.session_state.zip_read_lock: read_zip_archive(zip_buffer, lock), 
                 st.session_state.zip_filename, 
                 "application/zip", 
                 use_container_width=True, 
@@ -187,37 +396,59 @@ def toggle_all_selection(position):
     """Callback for 'Select All' checkboxes."""
     key = f'select_all_{position}'
     new_state = st.session_state[key]
-    for video in st.session_state.video_list:
-        st.session_state[video['id']] = new_state
+    st.session_state.update({video['id']: new_state for video in st.session_state.video_list})
     invalidate_zip()
 
+def read_zip_archive(zip_buffer, lock):
+    """
+    Reads a prepared ZIP archive from the start of its spooled file, for the deferred download button.
+    Streamlit loads whatever the callable returns into memory in one piece, so the spooled file only
+    bounds RAM until a download is clicked; each click briefly holds the whole archive. The lock keeps
+    the top and bottom buttons (and invalidate_zip) from racing on the shared file position.
+    """
+    with lock:
+        zip_buffer.seek(0)
+        return zip_buffer.read()
+
 def invalidate_zip():
     """Clears any previously generated ZIP file from state."""
-    st.session_state.zip_bytes = None
+    if st.session_state.get('zip_buffer'):
+        with st.session_state.zip_read_lock:
+            st.session_state.zip_buffer.close()
+    st.session_state.zip_buffer = None
+    st.session_state.zip_read_lock = None
     st.session_state.zipped_selection_ids = []
 
 def prepare_zip(selected_videos, user_id):
-    """Downloads selected videos and creates a zip file in memory."""
+    """Downloads selected videos and creates a zip file, spooled to disk once it grows large."""
     if not selected_videos:
         st.warning("No videos selected.")
         return
 
-    failed_videos_this_run = []
     with st.spinner("Downloading and zipping videos... Please wait."):
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-            download_progress = st.progress(0, text="Starting download...")
-            total_to_download = len(selected_videos)
-            for idx, video in enumerate(selected_videos):
-                title = video.get('title', 'video')[:30]
-                download_progress.progress((idx + 1) / total_to_download, text=f"Zipping '{title}...'")
-                
-                video_bytes, filename = robust_download_to_memory(video)
-
-                if video_bytes and filename:
-                    zip_file.writestr(filename, video_bytes)
+        download_progress = st.progress(0, text="Starting download...")
+        total_to_download = len(selected_videos)
+        failed_indices = []
+        # Spools to disk past ZIP_SPOOL_MAX_SIZE so large selections don't have to fit in RAM.
+        zip_buffer = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+        # MP4 is already compressed, so store entries as-is rather than burning CPU on deflate.
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED, allowZip64=True) as zip_file, \
+                ThreadPoolExecutor(max_workers=ZIP_DOWNLOAD_CONCURRENCY) as executor:
+            futures = {executor.submit(robust_download_to_memory, video): idx for idx, video in enumerate(selected_videos)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                idx = futures.pop(future)
+                title = selected_videos[idx].get('title', 'video')[:30]
+                download_progress.progress(done / total_to_download, text=f"Zipped '{title}...'")
+
+                # ZipFile is not thread-safe, so each result is written here on the main thread as soon as
+                # it arrives, then its buffer is closed; only in-flight downloads are held in memory.
+                video_file, filename = future.result()
+                if video_file and filename:
+                    with video_file, zip_file.open(filename, 'w', force_zip64=True) as zip_entry:
+                        shutil.copyfileobj(video_file, zip_entry, length=1024 * 1024)
                 else:
-                    failed_videos_this_run.append(video)
+                    failed_indices.append(idx)
+        failed_videos_this_run = [selected_videos[idx] for idx in sorted(failed_indices)]
         download_progress.empty()
 
     st.session_state.failed_videos = failed_videos_this_run
@@ -228,11 +459,16 @@ def prepare_zip(selected_videos, user_id):
         st.success("Zip is ready! Use the 'Download Zip Folder' button to save.")
 
     if zip_buffer.tell() > 0:
-        st.session_state.zip_bytes = zip_buffer.getvalue()
-        successful_ids = [v['id'] for v in selected_videos if v not in failed_videos_this_run]
+        invalidate_zip()
+        zip_buffer.seek(0)
+        st.session_state.zip_buffer = zip_buffer
+        st.session_state.zip_read_lock = threading.Lock()
+        failed_ids = {v['id'] for v in failed_videos_this_run}
+        successful_ids = [v['id'] for v in selected_videos if v['id'] not in failed_ids]
         st.session_state.zipped_selection_ids = successful_ids
         st.session_state.zip_filename = f"tiktok_download_{user_id}.zip"
     else:
+        zip_buffer.close()
         invalidate_zip()
 
 def display_failed_videos():
@@ -260,7 +496,7 @@ def run_app_1():
     
     if not st.session_state.get('download_triggered', False):
         selected_ids = {v['id'] for v in st.session_state.video_list if st.session_state.get(v['id'])}
-        if st.session_state.zip_bytes and selected_ids != set(st.session_state.zipped_selection_ids):
+        if st.session_state.zip_buffer and selected_ids != set(st.session_state.zipped_selection_ids):
             invalidate_zip()
         
     common_action_bar_ui(position="top")
@@ -271,14 +507,12 @@ def run_app_1():
     num_columns = 5
     for row_videos in chunked(st.session_state.video_list, num_columns):
         cols = st.columns(num_columns)
+        thumbnails = fetch_row_thumbnails([video.get('thumbnail') for video in row_videos])
         for idx, video in enumerate(row_videos):
             with cols[idx]:
-                st.image(video.get('thumbnail'), use_container_width=True)
-                tcol, bcol = st.columns([6, 1])
-                with tcol: st.toggle(f"❤️{video.get('like_count', 0):,}", key=video.get('id'), help="Select for ZIP download")
-                with bcol:
-                    vid_url = video.get('webpage_url') or video.get('url')
-                    if vid_url: render_copy_link_button(vid_url, key=f"{video.get('id')}_copy")
+                st.image(thumbnails[idx], use_container_width=True)
+                st.toggle(f"❤️{video.get('like_count', 0):,}", key=video.get('id'), help="Select for ZIP download")
+        render_copy_link_buttons_batch([(video.get('webpage_url') or video.get('url'), f"{video.get('id')}_copy") for video in row_videos], columns=num_columns)
         st.markdown("---")
         
     st.divider()
@@ -293,16 +527,16 @@ def run_app_2():
     def prepare_single_download_callback(video):
         st.session_state.prepared_download = {}
         st.session_state.preparing_video_id = video['id']
-        video_bytes, filename = robust_download_to_memory(video)
-        if video_bytes and filename:
-            st.session_state.prepared_download = {'id': video['id'], 'data': video_bytes, 'filename': filename}
+        video_file, filename = robust_download_to_memory(video)
+        if video_file and filename:
+            st.session_state.prepared_download = {'id': video['id'], 'data': video_file, 'filename': filename}
         else:
             st.session_state.toast_error = f"Failed to prepare '{video.get('title', 'video')[:30]}...'"
         st.session_state.preparing_video_id = None
         
     if not st.session_state.get('download_triggered', False):
         selected_ids = {v['id'] for v in st.session_state.video_list if st.session_state.get(v['id'])}
-        if st.session_state.zip_bytes and selected_ids != set(st.session_state.zipped_selection_ids):
+        if st.session_state.zip_buffer and selected_ids != set(st.session_state.zipped_selection_ids):
             invalidate_zip()
 
     common_action_bar_ui(position="top")
@@ -317,13 +551,12 @@ def run_app_2():
     num_columns = 5
     for row_videos in chunked(st.session_state.video_list, num_columns):
         cols = st.columns(num_columns)
+        thumbnails = fetch_row_thumbnails([video.get('thumbnail') for video in row_videos])
         for idx, video in enumerate(row_videos):
             video_id = video.get('id')
             with cols[idx]:
-                st.image(video.get('thumbnail'), use_container_width=True, caption=f"❤️{video.get('like_count', 0):,}")
-                tcol, ccol = st.columns([4, 1])
-                with tcol: st.toggle("Select for ZIP", key=video_id)
-                with ccol: render_copy_link_button(video.get('webpage_url'), f"{video_id}_copy")
+                st.image(thumbnails[idx], use_container_width=True, caption=f"❤️{video.get('like_count', 0):,}")
+                st.toggle("Select for ZIP", key=video_id)
                 
                 is_ready = st.session_state.prepared_download.get('id') == video_id
                 is_preparing = st.session_state.preparing_video_id == video_id
@@ -334,6 +567,7 @@ def run_app_2():
                     st.button("⏳ Preparing...", use_container_width=True, disabled=True)
                 else:
                     st.button("⬇️ Download Video", f"prepare_{video_id}", use_container_width=True, on_click=prepare_single_download_callback, args=(video,), disabled=st.session_state.preparing_video_id is not None)
+        render_copy_link_buttons_batch([(video.get('webpage_url'), f"{video.get('id')}_copy") for video in row_videos], columns=num_columns)
         st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
 
     st.divider()
@@ -347,7 +581,7 @@ def run_app_3():
     
     if not st.session_state.get('download_triggered', False):
         selected_ids = {v['id'] for v in st.session_state.video_list if st.session_state.get(v['id'])}
-        if st.session_state.zip_bytes and selected_ids != set(st.session_state.zipped_selection_ids):
+        if st.session_state.zip_buffer and selected_ids != set(st.session_state.zipped_selection_ids):
             invalidate_zip()
 
     common_action_bar_ui(position="top")
@@ -358,20 +592,21 @@ def run_app_3():
     with st.spinner("Preparing direct download links for all videos... (This may take a moment)"):
         for row_videos in chunked(st.session_state.video_list, num_columns):
             cols = st.columns(num_columns)
+            thumbnails = fetch_row_thumbnails([video.get('thumbnail') for video in row_videos])
             for idx, video in enumerate(row_videos):
                 video_id = video.get('id')
                 with cols[idx]:
-                    st.image(video.get('thumbnail'), use_container_width=True)
-                    video_bytes, filename = get_cached_download_data(video)
+                    st.image(thumbnails[idx], use_container_width=True)
+                    is_available, filename = get_cached_download_data(video)
                     
-                    tgl_col, cpy_col, dl_col = st.columns([5, 2, 2])
+                    tgl_col, dl_col = st.columns([7, 2])
                     with tgl_col: st.toggle(f"❤️ {video.get('like_count', 0):,}", key=video_id, help="Select for bulk .zip")
-                    with cpy_col: render_copy_link_button(video.get('webpage_url'), f"{video_id}_copy")
                     with dl_col:
-                        if video_bytes and filename:
-                            st.download_button("⬇️", video_bytes, filename, "video/mp4", key=f"dl_{video_id}", help=f"Download '{filename}'")
+                        if is_available:
+                            st.download_button("⬇️", lambda video=video: read_cached_download(video), filename, "video/mp4", key=f"dl_{video_id}", help=f"Download '{filename}'")
                         else:
                             st.button("❌", key=f"dl_err_{video_id}", disabled=True, help="Download unavailable")
+            render_copy_link_buttons_batch([(video.get('webpage_url'), f"{video.get('id')}_copy") for video in row_videos], columns=num_columns)
             st.write("")
 
     st.divider()
@@ -480,9 +715,11 @@ def main():
 
     if st.sidebar.button("🧹 Clear Download Cache", help="Clears the cache for downloaded video data (primarily used in App 3)."):
         st.cache_data.clear()
+        get_download_cache().clear()
         st.toast("Cache cleared successfully!", icon="✅")
 
     if st.sidebar.button("🔄 Restart Application", help="Clears all session data and returns to the app selection screen."):
+        invalidate_zip()
         keys = list(st.session_state.keys())
         for key in keys:
             del st.session_state[key]
@@ -544,7 +781,7 @@ def main():
                 else:
                     st.success(f"Successfully fetched details for {len(videos)} videos!")
                     st.session_state.video_list = videos
-                    for video in videos: st.session_state[video['id']] = False
+                    st.session_state.update({video['id']: False for video in videos})
         else:
             st.warning("Please enter a User ID.")
 